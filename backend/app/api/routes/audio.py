@@ -7,7 +7,6 @@ from app.models.audio import Audio
 from app.schemas.audio import AudioResponse, MessageResponse
 import librosa
 import os
-import shutil
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -57,19 +56,27 @@ async def upload_audio(
     filename  = _unique_filename(file.filename, ext)
     file_path = os.path.join(settings.UPLOAD_DIR, filename)
 
+    # Stream the upload to disk in 64 KiB chunks instead of buffering the
+    # whole body; the size limit is enforced mid-stream so oversized
+    # uploads are aborted without ever being written out in full.
+    file_size = 0
     try:
         with open(file_path, "wb") as buf:
-            shutil.copyfileobj(file.file, buf)
+            while chunk := await file.read(65536):
+                file_size += len(chunk)
+                if file_size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=413,
+                        detail=f"File too large. Maximum is {settings.MAX_UPLOAD_SIZE // (1024*1024)} MB.")
+                buf.write(chunk)
+    except HTTPException:
+        _safe_remove(file_path)
+        raise
     except OSError as exc:
+        _safe_remove(file_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {exc}")
     finally:
         await file.close()
 
-    file_size = os.path.getsize(file_path)
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        _safe_remove(file_path)
-        raise HTTPException(status_code=413,
-            detail=f"File too large. Maximum is {settings.MAX_UPLOAD_SIZE // (1024*1024)} MB.")
     if file_size == 0:
         _safe_remove(file_path)
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
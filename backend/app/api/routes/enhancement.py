@@ -1,9 +1,10 @@
 import os
 import tempfile
 import logging
+from hashlib import md5
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -39,6 +40,25 @@ def _require_file(path: str, label: str = "file") -> None:
         raise HTTPException(status_code=404, detail=f"{label} not found on disk.")
 
 
+def _conditional_file(path: str, media_type: str, filename: str, request: Request):
+    """
+    FileResponse with conditional-GET support.
+
+    Clients that re-fetch the enhanced file (the frontend polls then
+    downloads) get a bodiless 304 when their cached copy is current,
+    instead of re-streaming the whole WAV.  The ETag uses the same
+    mtime-size formula starlette derives from ``stat_result``, so the
+    value we compare against is the one the 200 response carried.
+    """
+    stat = os.stat(path)
+    etag = f'"{md5(f"{stat.st_mtime}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"etag": etag})
+    return FileResponse(path, media_type=media_type, filename=filename,
+                        stat_result=stat)
+
+
 @router.post("/enhance", response_model=EnhancementResponse,
              summary="Enhance audio using AI / DSP model")
 async def enhance_audio(request: EnhancementRequest, db: Session = Depends(get_db)):
@@ -93,6 +113,7 @@ async def enhance_audio(request: EnhancementRequest, db: Session = Depends(get_d
             summary="Download enhanced audio in any supported format")
 async def download_enhanced(
     audio_id: int,
+    request: Request,
     format: str = Query(
         default="wav",
         description=f"Export format: {', '.join(EXPORT_FORMATS.keys())}",
@@ -116,9 +137,9 @@ async def download_enhanced(
     out_name = f"{base}.{fmt}"
     mime     = EXPORT_FORMATS[fmt]
 
-    # WAV → serve directly (no conversion needed)
+    # WAV → serve directly (no conversion needed); honours If-None-Match
     if fmt == "wav":
-        return FileResponse(audio.enhanced_path, media_type=mime, filename=out_name)
+        return _conditional_file(audio.enhanced_path, mime, out_name, request)
 
     # Other formats → convert via torchaudio
     try:
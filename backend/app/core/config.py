@@ -30,11 +30,19 @@ class Settings(BaseSettings):
     # AI Model settings
     DEFAULT_SAMPLE_RATE: int = 44100
     DEFAULT_CHUNK_SIZE: int = 1024
+    # Optional neural denoiser: path to an ONNX model (RNNoise /
+    # DeepFilterNet export) taking a [1, N] float32 waveform.  Empty
+    # string keeps the pure-DSP pipeline.
+    ONNX_DENOISER_PATH: str = ""
 
     # Enhancement defaults
     DEFAULT_NOISE_REDUCTION: float = 0.8
     DEFAULT_PROCESSING_MODE: str = "balanced"
 
+    # Spectrograms: render the bare heatmap via Pillow (fast) instead of
+    # the full matplotlib figure with axes/colorbar.
+    SPECTROGRAM_FAST_RENDER: bool = False
+
     # AQI thresholds
     AQI_GOOD_THRESHOLD: float = 70.0
     AQI_FAIR_THRESHOLD: float = 40.0
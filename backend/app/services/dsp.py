@@ -0,0 +1,232 @@
+"""
+Shared DSP primitives
+──────────────────────
+Hot-path spectral helpers used by the AQI, enhancement, forensics and
+explainability services.
+
+The STFT here replaces per-call `librosa.stft` in compute-bound paths:
+librosa rebuilds its framing buffers and window on every invocation and
+routes through NumPy's single-threaded pocketfft.  We instead keep the
+Hann window cached per `n_fft` and run one batched `scipy.fft.rfft` with
+`workers=-1`, so only the FFT itself executes per call.
+"""
+
+import functools
+import logging
+import math
+
+import numpy as np
+import scipy.fft
+import soundfile
+from scipy.signal.windows import hann
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+_EPS = 1e-12
+
+
+def load_audio(path: str, mono: bool = True):
+    """
+    Decode an audio file to float32 at its native sample rate.
+
+    WAV/FLAC/OGG go straight through libsndfile (C decode, no resampler
+    in the path); compressed formats libsndfile rejects (mp3/m4a/…) fall
+    back to ``librosa.load``.  Returns ``(y, sr)`` with librosa's layout:
+    1-D for mono, (channels, samples) otherwise.
+    """
+    try:
+        y, sr = soundfile.read(path, dtype="float32", always_2d=False)
+    except Exception as exc:
+        logger.debug("soundfile decode failed for %s (%s), using librosa", path, exc)
+        import librosa
+        return librosa.load(path, sr=None, mono=mono)
+
+    if y.ndim == 2:
+        y = y.mean(axis=1, dtype=np.float32) if mono \
+            else np.ascontiguousarray(y.T)
+    return y, sr
+
+
+def db10(x: float) -> float:
+    """``10·log10(x)`` for Python scalars.
+
+    np.log10 on a 0-d value pays the full ufunc-dispatch cost per call;
+    math.log10 is ~20× cheaper.  Array-valued conversions should stay on
+    the vectorized np.log10.
+    """
+    return 10.0 * math.log10(x)
+
+
+def db20(x: float) -> float:
+    """``20·log10(x)`` for Python scalars (see :func:`db10`)."""
+    return 20.0 * math.log10(x)
+
+
+def mean_square(x: np.ndarray) -> float:
+    """
+    Mean of ``x**2`` as a scalar, via ``np.dot(x, x)``.
+
+    Dispatches to BLAS dot (sdot/ddot) — a fused multiply-accumulate with
+    no same-size squared temporary, which matters when *x* is a whole
+    waveform.  Returns 0.0 for empty input instead of np.mean's NaN.
+    """
+    n = x.size
+    if n == 0:
+        return 0.0
+    return float(np.dot(x, x)) / n
+
+
+def cumulative_power(y: np.ndarray) -> np.ndarray:
+    """
+    Prefix sums of ``y**2`` (float64 accumulator, leading zero), so any
+    framed energy becomes two lookups: ``cum[s+L] - cum[s]``.
+
+    Compute once per request and derive every RMS / block-power series
+    from it instead of re-framing the signal per metric.
+    """
+    cum = np.empty(len(y) + 1, dtype=np.float64)
+    cum[0] = 0.0
+    np.cumsum(np.square(y, dtype=np.float64), out=cum[1:])
+    return cum
+
+
+def frame_rms(cum: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """
+    Centered framed RMS from a :func:`cumulative_power` array, matching
+    ``librosa.feature.rms(y, frame_length, hop_length)[0]`` (zero-padded
+    edges, division by the full frame length).
+    """
+    n = len(cum) - 1
+    n_frames = 1 + (n + 2 * (frame_length // 2) - frame_length) // hop_length
+    starts = np.arange(n_frames) * hop_length - frame_length // 2
+    lo = np.clip(starts, 0, n)
+    hi = np.clip(starts + frame_length, 0, n)
+    return np.sqrt((cum[hi] - cum[lo]) / frame_length)
+
+
+def block_powers(cum: np.ndarray, block_length: int) -> np.ndarray:
+    """Mean power of consecutive non-overlapping blocks, from prefix sums."""
+    n = len(cum) - 1
+    edges = np.arange(0, n + block_length, block_length)
+    edges[-1] = min(edges[-1], n)
+    if edges[-1] == edges[-2]:
+        edges = edges[:-1]
+    return (cum[edges[1:]] - cum[edges[:-1]]) / np.diff(edges)
+
+
+@functools.lru_cache(maxsize=8)
+def hann_window(n_fft: int) -> np.ndarray:
+    """Periodic Hann window (librosa-compatible), float32, cached per n_fft."""
+    return hann(n_fft, sym=False).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=8)
+def stft_plan(n_fft: int, hop_length: int):
+    """
+    Cached ``scipy.signal.ShortTimeFFT`` instance per (n_fft, hop).
+
+    Used for analysis/synthesis round trips (STFT → spectral gain →
+    ISTFT): framing, FFT and the overlap-add inverse all run in C, and
+    the dual synthesis window is computed once per plan instead of on
+    every request.  The transform itself is sample-rate independent, so
+    plans are keyed on geometry only (``fs`` is a dummy 1.0).
+    """
+    from scipy.signal import ShortTimeFFT
+    return ShortTimeFFT(hann_window(n_fft), hop=hop_length, fs=1.0,
+                        mfft=n_fft, phase_shift=None)
+
+
+@functools.lru_cache(maxsize=16)
+def _welch_plan(sr: int, nperseg: int):
+    """Cached (freqs, window, density scale) for :func:`welch_psd`."""
+    win = hann_window(nperseg)
+    scale = 1.0 / (sr * float(np.sum(win.astype(np.float64) ** 2)))
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / sr)
+    return freqs, win, scale
+
+
+def welch_psd(y: np.ndarray, sr: int, nperseg: int):
+    """
+    Welch power spectral density with scipy's defaults (periodic Hann,
+    50 % overlap, constant detrend, one-sided density scaling), returning
+    ``(freqs, psd)`` exactly like ``scipy.signal.welch``.
+
+    ``welch`` rebuilds its window and workspace on every call; here the
+    window/scale/freqs are cached per ``(sr, nperseg)``, framing is a
+    strided view and the batched rfft runs with ``workers=-1``.
+    """
+    y = np.asarray(y)
+    nperseg = min(nperseg, y.size)
+    freqs, win, scale = _welch_plan(sr, nperseg)
+
+    step = nperseg - nperseg // 2
+    frames = sliding_window_view(y, nperseg)[::step]
+    frames = frames - frames.mean(axis=1, keepdims=True)   # constant detrend
+    spec = scipy.fft.rfft(frames * win, axis=1, workers=-1)
+    psd = (spec.real ** 2 + spec.imag ** 2).mean(axis=0) * scale
+    # One-sided: double everything except DC (and Nyquist when present)
+    if nperseg % 2 == 0:
+        psd[1:-1] *= 2.0
+    else:
+        psd[1:] *= 2.0
+    return freqs, psd
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_torch():
+    """torch module when CUDA is usable, else None (probed once)."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch
+    except Exception:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _cuda_hann(n_fft: int):
+    """Periodic Hann window resident on the GPU, one tensor per n_fft
+    (only called after :func:`_cuda_torch` has confirmed CUDA)."""
+    return _cuda_torch().hann_window(n_fft, periodic=True, device="cuda")
+
+
+def _cuda_stft(y: np.ndarray, n_fft: int, hop_length: int):
+    """
+    STFT on CUDA via torch (already a hard dependency of this backend),
+    or None when no GPU is usable.  ``pad_mode='constant'`` and a
+    periodic Hann window reproduce :func:`stft`'s librosa-compatible
+    layout exactly, so callers cannot tell the backends apart.
+    """
+    torch = _cuda_torch()
+    if torch is None:
+        return None
+    try:
+        t = torch.from_numpy(np.ascontiguousarray(y)).cuda()
+        D = torch.stft(t, n_fft=n_fft, hop_length=hop_length,
+                       window=_cuda_hann(n_fft),
+                       center=True, pad_mode='constant', return_complex=True)
+        return D.cpu().numpy().astype(np.complex64, copy=False)
+    except Exception as exc:
+        logger.warning("CUDA STFT failed, falling back to CPU: %s", exc)
+        return None
+
+
+def stft(y: np.ndarray, n_fft: int = 2048, hop_length: int = 512) -> np.ndarray:
+    """
+    Centered STFT matching ``librosa.stft`` layout: shape
+    (1 + n_fft//2, 1 + len(y)//hop_length), complex64.
+
+    Runs on CUDA when a GPU is present (the FFT is the dominant cost on
+    long inputs); otherwise framing is a zero-copy strided view and the
+    batched rfft runs across all available cores via ``workers=-1``.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    D = _cuda_stft(y, n_fft, hop_length)
+    if D is not None:
+        return D
+    padded = np.pad(y, n_fft // 2)
+    frames = sliding_window_view(padded, n_fft)[::hop_length]
+    spec = scipy.fft.rfft(frames * hann_window(n_fft), axis=1, workers=-1)
+    return np.ascontiguousarray(spec.T, dtype=np.complex64)
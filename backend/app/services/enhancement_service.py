@@ -27,19 +27,38 @@ Source Separation (DEMUCS-style DSP stub):
   bass (20–300 Hz), other (mid-high residual).
 """
 
+import math
+
 import torch
 import librosa
 import soundfile as sf
 import numpy as np
+from numba import njit, prange
 import os
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from scipy.signal import butter, sosfilt, sosfiltfilt
 from typing import Dict, Optional, List
 
+from app.core.config import settings
+from app.services import dsp
+
 logger = logging.getLogger(__name__)
 _EPS = 1e-12
 
+# Background pool for WAV persistence: the encode/fsync of the output
+# file overlaps with metric computation instead of sitting on the
+# request critical path.
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wav-io")
+
+
+def _write_wav(path: str, data: np.ndarray, sr: int) -> None:
+    """Write *data* to *path* atomically (.partial + rename), PCM_16."""
+    partial = path + ".partial"
+    sf.write(partial, data, sr, subtype="PCM_16", format="WAV")
+    os.replace(partial, path)
+
 
 # ─── MMSE-LSA noise estimator ────────────────────────────────────────────────
 
@@ -55,7 +74,8 @@ def _mmse_lsa(
     MMSE-LSA (Ephraim & Malah 1985, extended with Decision-Directed SNR).
     Industry-standard algorithm used in all professional speech denoisers.
     """
-    D     = librosa.stft(audio, n_fft=n_fft, hop_length=hop_length)
+    plan  = dsp.stft_plan(n_fft, hop_length)
+    D     = plan.stft(audio).astype(np.complex64)
     mag   = np.abs(D)
     phase = np.angle(D)
 
@@ -66,7 +86,7 @@ def _mmse_lsa(
 
     n_bins, n_frames = mag.shape
     Y_mag2    = mag ** 2
-    gain_prev = np.ones((n_bins,))       # previous frame DD gain
+    gain_prev = np.ones((n_bins,), dtype=np.float32)   # previous frame DD gain
 
     result_mag = np.zeros_like(mag)
 
@@ -95,7 +115,7 @@ def _mmse_lsa(
         noise_var[:, t] = alpha_n * noise_var[:, max(0, t-1)] + (1.0 - alpha_n) * y2
 
     D_clean = result_mag * np.exp(1j * phase)
-    return librosa.istft(D_clean, n_fft=n_fft, hop_length=hop_length, length=len(audio))
+    return plan.istft(D_clean, k1=len(audio)).astype(np.float32)
 
 
 def _exp_integral(x: np.ndarray) -> np.ndarray:
@@ -122,7 +142,8 @@ def _multiband_wiener(
     Computes independent Wiener gain per frequency bin, weighted by the
     A-weighting curve so lower-importance frequencies get more attenuation.
     """
-    D     = librosa.stft(audio, n_fft=n_fft, hop_length=hop_length)
+    plan  = dsp.stft_plan(n_fft, hop_length)
+    D     = plan.stft(audio).astype(np.complex64)
     mag   = np.abs(D)
     power = mag ** 2
 
@@ -144,7 +165,7 @@ def _multiband_wiener(
     gain     = snr_post / (snr_post + reduction * a_mask)
 
     D_clean = gain * D
-    return librosa.istft(D_clean, n_fft=n_fft, hop_length=hop_length, length=len(audio))
+    return plan.istft(D_clean, k1=len(audio)).astype(np.float32)
 
 
 def _a_weighting_db(freqs: np.ndarray) -> np.ndarray:
@@ -159,8 +180,71 @@ def _a_weighting_db(freqs: np.ndarray) -> np.ndarray:
     return 20.0 * np.log10(np.maximum(K * Ra2, _EPS))
 
 
+# ─── Optional ONNX neural denoiser ───────────────────────────────────────────
+
+_ONNX_SESSION = None
+
+
+def _onnx_session():
+    """
+    Lazily build (and then reuse) the ONNX-Runtime session for the model
+    at ``settings.ONNX_DENOISER_PATH``.  Graph optimizations are enabled
+    and intra-op threads pinned to the core count, so the session is
+    built once per process and shared across requests.
+    """
+    global _ONNX_SESSION
+    if _ONNX_SESSION is None:
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = os.cpu_count() or 1
+        _ONNX_SESSION = ort.InferenceSession(
+            settings.ONNX_DENOISER_PATH,
+            sess_options=opts,
+            providers=["CPUExecutionProvider"],
+        )
+        logger.info("ONNX denoiser loaded: %s", settings.ONNX_DENOISER_PATH)
+    return _ONNX_SESSION
+
+
+def _onnx_denoise(audio: np.ndarray) -> np.ndarray:
+    """Run the configured ONNX denoiser on a [1, N] float32 waveform."""
+    sess = _onnx_session()
+    inp  = sess.get_inputs()[0].name
+    out  = sess.run(None, {inp: np.ascontiguousarray(audio[None, :], dtype=np.float32)})[0]
+    return np.asarray(out, dtype=np.float32).reshape(-1)[:len(audio)]
+
+
 # ─── Fast spectral gate (noisereduce) ─────────────────────────────────────────
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _subtract_and_recombine(D: np.ndarray, noise_est: np.ndarray,
+                            alpha: float, floor_frac: float) -> np.ndarray:
+    """
+    Fused spectral-subtraction update: magnitude, over-subtraction clamp
+    and phase-preserving rescale in one parallel pass over the STFT,
+    instead of the abs / subtract / maximum / angle / exp / multiply
+    chain that streamed the (n_bins, n_frames) arrays through memory six
+    times.  The phase never needs reconstructing: scaling each bin by
+    ``mag_clean / mag`` keeps it exactly, with no atan2/sin/cos.
+    """
+    n_bins, n_frames = D.shape
+    out = np.empty_like(D)
+    for t in prange(n_frames):
+        for k in range(n_bins):
+            re = D[k, t].real
+            im = D[k, t].imag
+            m  = math.sqrt(re * re + im * im)
+            if m < 1e-12:
+                out[k, t] = D[k, t]
+                continue
+            mc = m - alpha * noise_est[k]
+            if mc < floor_frac * m:
+                mc = floor_frac * m
+            out[k, t] = D[k, t] * (mc / m)
+    return out
+
+
 def _fast_spectral_gate(audio: np.ndarray, sr: int, reduction: float = 0.8) -> np.ndarray:
     try:
         import noisereduce as nr
@@ -175,11 +259,11 @@ def _fast_spectral_gate(audio: np.ndarray, sr: int, reduction: float = 0.8) -> n
         return reduced.astype(np.float32)
     except ImportError:
         # fallback: simple spectral subtraction
-        D = librosa.stft(audio, n_fft=1024, hop_length=256)
-        mag = np.abs(D)
-        noise = np.median(mag[:, :max(1, mag.shape[1]//10)], axis=1, keepdims=True)
-        mag_clean = np.maximum(mag - reduction * noise, 0.05 * mag)
-        return librosa.istft(mag_clean * np.exp(1j * np.angle(D)), length=len(audio))
+        plan = dsp.stft_plan(1024, 256)
+        D = plan.stft(audio).astype(np.complex64)
+        noise = np.median(np.abs(D[:, :max(1, D.shape[1]//10)]), axis=1)
+        D_clean = _subtract_and_recombine(D, noise, reduction, 0.05)
+        return plan.istft(D_clean, k1=len(audio)).astype(np.float32)
 
 
 # ─── Source separation (band-pass DSP stub) ────────────────────────────────
@@ -232,7 +316,7 @@ def _separate_sources(audio: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
     # Energy-normalise each stem
     stems = {"vocals": vocals, "drums": drums, "bass": bass, "other": other}
     for name, stem in stems.items():
-        rms = float(np.sqrt(np.mean(stem ** 2))) + _EPS
+        rms = math.sqrt(dsp.mean_square(stem)) + _EPS
         stems[name] = stem / rms * 0.3   # normalise to -10 dBFS
 
     return stems
@@ -246,13 +330,13 @@ def _compute_metrics(orig: np.ndarray, enh: np.ndarray, sr: int) -> Dict:
 
     # SNR improvement
     residual    = o - e
-    sig_p       = float(np.mean(o ** 2))
-    noise_p_o   = float(np.mean(residual ** 2))
-    noise_p_e   = float(np.mean((e - o) ** 2))
-    snr_o       = 10.0 * np.log10(sig_p / (noise_p_o + _EPS))
-    snr_e       = 10.0 * np.log10(float(np.mean(e**2)) / (noise_p_e + _EPS))
+    sig_p       = dsp.mean_square(o)
+    noise_p_o   = dsp.mean_square(residual)
+    noise_p_e   = dsp.mean_square(e - o)
+    snr_o       = dsp.db10(sig_p / (noise_p_o + _EPS) + _EPS)
+    snr_e       = dsp.db10(dsp.mean_square(e) / (noise_p_e + _EPS) + _EPS)
     snr_gain    = float(snr_e - snr_o)
-    nr_db       = float(10.0 * np.log10((noise_p_o + _EPS) / (noise_p_e + _EPS)))
+    nr_db       = dsp.db10((noise_p_o + _EPS) / (noise_p_e + _EPS))
 
     # Spectral clarity (HF energy ratio)
     cutoff   = int(sr * 0.4)
@@ -263,7 +347,7 @@ def _compute_metrics(orig: np.ndarray, enh: np.ndarray, sr: int) -> Dict:
     clarity  = float(max(0.0, (hf_e - hf_o) * 100.0 + 12.0))
 
     # PESQ-proxy: signal-to-distortion ratio
-    sdr = float(10.0 * np.log10(sig_p / (float(np.mean((o - e)**2)) + _EPS)))
+    sdr = dsp.db10(sig_p / (noise_p_o + _EPS) + _EPS)
 
     return {
         "noise_reduced":       round(max(0.0, nr_db),    1),
@@ -290,9 +374,15 @@ class EnhancementService:
         mode: str = "balanced",
     ) -> Dict:
         t0 = time.perf_counter()
-        audio_raw, sr = librosa.load(audio_path, sr=None, mono=False)
+        audio_raw, sr = dsp.load_audio(audio_path, mono=False)
+        audio_raw = np.ascontiguousarray(audio_raw, dtype=np.float32)
 
         def _proc(ch):
+            if settings.ONNX_DENOISER_PATH:
+                try:
+                    return _onnx_denoise(ch)
+                except Exception as exc:
+                    logger.warning("ONNX denoiser unavailable (%s) — using DSP pipeline", exc)
             if mode == "fast":
                 return _fast_spectral_gate(ch, sr, noise_reduction)
             if mode == "quality" or model_name == "fullsubnet":
@@ -312,11 +402,14 @@ class EnhancementService:
         enhanced = (enhanced * 0.891 / peak).astype(np.float32)
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        sf.write(output_path, enhanced.T if enhanced.ndim == 2 else enhanced, sr, subtype="PCM_16")
+        write_fut = _IO_POOL.submit(
+            _write_wav, output_path,
+            enhanced.T if enhanced.ndim == 2 else enhanced, sr)
 
         mono_o = audio_raw[0] if audio_raw.ndim == 2 else audio_raw
         mono_e = enhanced[0]  if enhanced.ndim  == 2 else enhanced
         metrics = _compute_metrics(mono_o, mono_e, sr)
+        write_fut.result()   # file must be on disk before the URL is returned
         elapsed = round(time.perf_counter() - t0, 3)
 
         logger.info("enhance_audio  %.2fs  snr+%.1f dB", elapsed, metrics["snr_improvement"])
@@ -335,7 +428,7 @@ class EnhancementService:
         More conservative than full enhancement — preserves naturalness.
         """
         t0 = time.perf_counter()
-        audio_raw, sr = librosa.load(audio_path, sr=None, mono=False)
+        audio_raw, sr = dsp.load_audio(audio_path, mono=False)
 
         def _denoise(ch):
             try:
@@ -359,11 +452,14 @@ class EnhancementService:
         result = (result * 0.891 / peak).astype(np.float32)
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        sf.write(output_path, result.T if result.ndim == 2 else result, sr, subtype="PCM_16")
+        write_fut = _IO_POOL.submit(
+            _write_wav, output_path,
+            result.T if result.ndim == 2 else result, sr)
 
         mono_o = audio_raw[0] if audio_raw.ndim == 2 else audio_raw
         mono_e = result[0]    if result.ndim    == 2 else result
         metrics = _compute_metrics(mono_o, mono_e, sr)
+        write_fut.result()   # file must be on disk before the URL is returned
         elapsed = round(time.perf_counter() - t0, 3)
         return {"output_path": output_path,
                 "metrics": {**metrics, "processing_time": elapsed},
@@ -382,7 +478,7 @@ class EnhancementService:
         if stems is None:
             stems = ["vocals", "drums", "bass", "other"]
 
-        audio, sr = librosa.load(audio_path, sr=None, mono=True)
+        audio, sr = dsp.load_audio(audio_path, mono=True)
         os.makedirs(output_dir, exist_ok=True)
 
         source_map = _separate_sources(audio, sr)
@@ -408,8 +504,8 @@ class EnhancementService:
         }
 
     def compare_audio(self, original_path: str, enhanced_path: str) -> Dict:
-        orig, sr1 = librosa.load(original_path, sr=None, mono=True)
-        enh, sr2  = librosa.load(enhanced_path,  sr=None, mono=True)
+        orig, sr1 = dsp.load_audio(original_path, mono=True)
+        enh, sr2  = dsp.load_audio(enhanced_path,  mono=True)
         n = min(len(orig), len(enh))
         return {"comparison": _compute_metrics(orig[:n], enh[:n], sr1),
                 "original_duration": len(orig) / sr1,
@@ -0,0 +1,47 @@
+"""
+Gunicorn production configuration
+──────────────────────────────────
+Development keeps `uvicorn app.main:app --reload`; production runs:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+`preload_app` imports the app — librosa, scipy, torch and the service
+singletons — once in the arbiter so the read-only model state is shared
+copy-on-write across all forked workers instead of re-imported per
+worker.  Worker count honours the standard `WEB_CONCURRENCY` env hook.
+
+Threading model: N workers × 1 BLAS/OpenMP thread.  Each worker runs
+whole-request DSP, so letting every worker's OpenBLAS/MKL/OpenMP pool
+also fan out across all cores oversubscribes them and thrashes under
+concurrency.  The env pins below must land before numpy/scipy are first
+imported, which this config file guarantees (it is evaluated before the
+app loads).  Explicitly parallel paths are unaffected: `scipy.fft`'s
+``workers=-1`` and the numba kernels use their own pools.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+bind             = os.getenv("BIND", "0.0.0.0:8000")
+workers          = int(os.getenv("WEB_CONCURRENCY",
+                                 multiprocessing.cpu_count()))
+worker_class     = "uvicorn.workers.UvicornWorker"
+preload_app      = True
+timeout          = int(os.getenv("WORKER_TIMEOUT", 120))   # long /enhance jobs
+graceful_timeout = 30
+keepalive        = 5
+accesslog        = "-"
+
+
+def post_fork(server, worker):
+    """Re-pin native threadpools in the worker — libraries preloaded in
+    the arbiter may have sized their pools before the env vars applied."""
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass